@@ -2,11 +2,17 @@
 Authentication utilities for TaskRhythm.
 
 Handles password hashing, verification, and session management.
-Uses bcrypt for secure password hashing.
+Uses bcrypt for secure password hashing. The bcrypt work is offloaded to a
+worker thread so it does not block the event loop.
 """
 
+import asyncio
+import time
+from collections import OrderedDict
+
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, load_only
 from fastapi import HTTPException, status
 
 from .models import User
@@ -15,6 +21,21 @@ from .schemas import UserCreate
 # Password hashing context using bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is the only scheme, so call its handler directly and skip the
+# context's per-call scheme identification
+_bcrypt = pwd_context.handler("bcrypt")
+
+# Verified against when the username does not exist, so unknown and known
+# usernames take the same time to reject. Computing it at import also loads
+# passlib's bcrypt backend up front, so the first login after startup
+# doesn't pay for it.
+_DUMMY_HASH = _bcrypt.hash("x" * 16)
+
+# Short-lived, process-wide cache of users by ID: {user_id: (expires_at, user)}
+USER_CACHE_TTL = 30  # seconds
+USER_CACHE_MAXSIZE = 1024
+_user_cache: OrderedDict[int, tuple[float, User]] = OrderedDict()
+
 
 def hash_password(password: str) -> str:
     """
@@ -26,7 +47,7 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    return pwd_context.hash(password)
+    return _bcrypt.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -40,10 +61,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _bcrypt.verify(plain_password, hashed_password)
 
 
-def create_user(db: Session, user_data: UserCreate) -> User:
+async def create_user(db: Session, user_data: UserCreate) -> User:
     """
     Create a new user with hashed password.
     
@@ -57,27 +78,36 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     Raises:
         HTTPException: If username or email already exists
     """
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
-    if existing_user:
+    # Check username and email in one query (at most two rows can match
+    # thanks to the unique constraints)
+    existing = db.query(User.username, User.email).filter(
+        or_(User.username == user_data.username, User.email == user_data.email)
+    ).all()
+    
+    if any(row.username == user_data.username for row in existing):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
+    # End the read transaction so its pooled connection isn't held while
+    # waiting on bcrypt
+    db.rollback()
+    
+    # Hash in a worker thread - bcrypt is slow by design
+    password_hash = await asyncio.to_thread(hash_password, user_data.password)
+    
     # Create new user with hashed password
     db_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=hash_password(user_data.password)
+        password_hash=password_hash
     )
     db.add(db_user)
     db.commit()
@@ -86,10 +116,13 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     return db_user
 
 
-def authenticate_user(db: Session, username: str, password: str) -> User | None:
+async def authenticate_user(db: Session, username: str, password: str) -> User | None:
     """
     Authenticate a user by username and password.
     
+    The user lookup runs on the event loop; the bcrypt verification runs
+    in a worker thread. The returned user is detached from the session.
+    
     Args:
         db: Database session
         username: Username to authenticate
@@ -99,17 +132,29 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
         User object if authentication successful, None otherwise
     """
     user = db.query(User).filter(User.username == username).first()
-    if not user:
-        return None
-    if not verify_password(password, user.password_hash):
-        return None
-    return user
+    
+    # End the read transaction so its pooled connection isn't held while
+    # waiting on bcrypt. The user is detached first so it stays loaded.
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    
+    # Always pay for exactly one bcrypt verification to avoid leaking
+    # whether the username exists through response timing
+    target_hash = user.password_hash if user is not None else _DUMMY_HASH
+    password_ok = await asyncio.to_thread(verify_password, password, target_hash)
+    
+    return user if (user is not None) & password_ok else None
 
 
 def get_current_user(db: Session, user_id: int) -> User | None:
     """
     Get user by ID from session.
     
+    Results are cached for USER_CACHE_TTL seconds. The returned user is
+    detached from the session and only has its id, username, email and
+    created_at loaded.
+    
     Args:
         db: Database session
         user_id: User ID from session
@@ -117,5 +162,40 @@ def get_current_user(db: Session, user_id: int) -> User | None:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.id == user_id).first()
+    now = time.monotonic()
+    cached = _user_cache.get(user_id)
+    if cached is not None and cached[0] > now:
+        _user_cache.move_to_end(user_id)
+        return cached[1]
+    
+    # password_hash is only needed by authenticate_user, so don't load it
+    user = db.get(
+        User,
+        user_id,
+        options=[load_only(User.id, User.username, User.email, User.created_at)]
+    )
+    if user is None:
+        _user_cache.pop(user_id, None)
+        return None
+    
+    # Detach so a later commit on this session can't expire the cached copy
+    db.expunge(user)
+    _user_cache[user_id] = (now + USER_CACHE_TTL, user)
+    _user_cache.move_to_end(user_id)
+    while len(_user_cache) > USER_CACHE_MAXSIZE:
+        _user_cache.popitem(last=False)
+    
+    return user
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """
+    Drop a user from the cache used by get_current_user.
+    
+    Call this whenever the user logs out or their account changes.
+    
+    Args:
+        user_id: User ID to invalidate
+    """
+    _user_cache.pop(user_id, None)
 
@@ -5,7 +5,7 @@ Uses SQLite for MVP simplicity with SQLAlchemy ORM.
 """
 
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -18,9 +18,32 @@ DATABASE_URL = f"sqlite:///{DATABASE_DIR}/taskrhythm.db"
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
+    pool_size=20,  # Connections kept open between requests
+    max_overflow=40,  # Extra connections allowed during bursts
+    pool_timeout=30,  # Seconds to wait for a free connection
     echo=False  # Set to True for SQL query debugging
 )
 
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection.
+    
+    WAL mode lets readers proceed while a write is in progress, and
+    synchronous=NORMAL is safe under WAL while needing fewer fsyncs.
+    Foreign keys are enforced, which SQLite leaves off by default.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB
+    cursor.close()
+
+
 # Session factory for database operations
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -34,12 +57,21 @@ def get_db():
     
     Yields database session and ensures it's closed after use.
     Use with FastAPI's Depends() for automatic session management.
+    
+    The session only checks out a connection on its first query, so
+    handlers that return early (e.g. unauthenticated redirects) never
+    touch the connection pool.
     """
-    db = SessionLocal()
-    try:
+    with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+# Indexes from earlier versions of the models that init_db removes
+REPLACED_INDEXES = (
+    "ix_tasks_user_id",
+    "ix_energy_windows_user_id",
+    "ix_tasks_user_completed_window",
+)
 
 
 def init_db():
@@ -47,7 +79,43 @@ def init_db():
     Initialize database by creating all tables.
     
     Call this on application startup to ensure tables exist.
-    Safe to call multiple times - only creates missing tables.
+    Safe to call multiple times - only creates missing tables and indexes.
     """
+    # Importing the models registers their tables on Base.metadata
+    from .models import DAYS, LEVELS
+    
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips indexes on tables that already exist, so add any
+    # indexes introduced since the database was first created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # Drop indexes that have since been replaced by composite ones, so
+    # upgraded databases don't keep paying for them on writes or have the
+    # planner pick them over the replacements
+    with engine.begin() as connection:
+        for index_name in REPLACED_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    
+    # Energy windows used to store day names, and windows and tasks used to
+    # store level names; convert any left over to numbers (0 = Monday,
+    # 0 = high). The forms used to store whatever string they were sent, so
+    # day names are matched case-insensitively and values that were never a
+    # known day or level are left as they are.
+    day_numbers = " ".join(f"WHEN '{day.lower()}' THEN {number}" for number, day in enumerate(DAYS))
+    day_names = ", ".join(f"'{day.lower()}'" for day in DAYS)
+    level_numbers = " ".join(f"WHEN '{level}' THEN {number}" for number, level in enumerate(LEVELS))
+    level_names = ", ".join(f"'{level}'" for level in LEVELS)
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"UPDATE energy_windows SET day_of_week = CASE lower(day_of_week) {day_numbers} END "
+            f"WHERE lower(day_of_week) IN ({day_names})"
+        ))
+        for table, column in (("energy_windows", "energy_level"), ("tasks", "effort_level")):
+            connection.execute(text(
+                f"UPDATE {table} SET {column} = CASE {column} {level_numbers} END "
+                f"WHERE {column} IN ({level_names})"
+            ))
 
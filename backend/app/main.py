@@ -7,13 +7,13 @@ based on natural energy levels instead of rigid time blocks.
 
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
-from starlette.middleware.sessions import SessionMiddleware
 from pathlib import Path
 import secrets
 
 from .database import init_db
+from .session import SessionMiddleware
+from .templates import templates
 from .routers import auth, energy, tasks, schedule
 
 # Initialize FastAPI app
@@ -28,10 +28,9 @@ app = FastAPI(
 SECRET_KEY = secrets.token_urlsafe(32)
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
-# Setup static files and templates
+# Setup static files
 BASE_DIR = Path(__file__).parent.parent
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -5,11 +5,68 @@ Models represent the core entities: Users, EnergyWindows, and Tasks.
 """
 
 from datetime import datetime
-from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, ForeignKey, Time, Date
+from sqlalchemy import Boolean, Column, Integer, SmallInteger, String, Text, DateTime, ForeignKey, Time, Date, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 
 from .database import Base
 
+# Day names in week order; a day's index is how it is stored in the database
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Energy and effort levels, highest first
+LEVELS = ("high", "medium", "low")
+
+
+class DayOfWeek(TypeDecorator):
+    """
+    Day of week stored as a small integer (0 = Monday ... 6 = Sunday).
+    
+    Python code keeps working with day names, while the database stores
+    compact integers that sort in chronological order.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return DAYS.index(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Columns created as text hand numbers back as strings, and may
+        # still hold a value that was never a known day
+        if isinstance(value, str) and not value.isdigit():
+            return value
+        return DAYS[int(value)]
+
+
+class Level(TypeDecorator):
+    """
+    Energy or effort level stored as a small integer (0 = high ... 2 = low).
+    
+    Python code keeps working with level names, while the database stores
+    compact integers.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return LEVELS.index(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Columns created as text hand numbers back as strings, and may
+        # still hold a value that was never a known level
+        if isinstance(value, str) and not value.isdigit():
+            return value
+        return LEVELS[int(value)]
+
 
 class User(Base):
     """
@@ -41,13 +98,17 @@ class EnergyWindow(Base):
     Users define these to match their natural rhythms.
     """
     __tablename__ = "energy_windows"
+    __table_args__ = (
+        # Matches the window listing: filter by user, order by day and time
+        Index("ix_ew_user_day_time", "user_id", "day_of_week", "time_start"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    day_of_week = Column(String(10), nullable=False)  # Monday-Sunday
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day_of_week = Column(DayOfWeek, nullable=False)  # Monday-Sunday, stored as 0-6
     time_start = Column(Time, nullable=False)
     time_end = Column(Time, nullable=False)
-    energy_level = Column(String(10), nullable=False)  # high, medium, low
+    energy_level = Column(Level, nullable=False)  # high, medium, low, stored as 0-2
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
@@ -66,12 +127,30 @@ class Task(Base):
     Tasks are assigned to energy windows by the scheduling algorithm.
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Matches the schedule queries (user's open tasks, split by
+        # assignment) and covers the columns the scheduler reads, so SQLite
+        # can answer those queries from the index alone
+        Index(
+            "ix_tasks_cover",
+            "user_id",
+            "is_completed",
+            "assigned_window_id",
+            "effort_level",
+            "estimated_duration",
+            "deadline",
+            "created_at"
+        ),
+        # Matches clearing a user's schedule, which touches assigned tasks
+        # whether or not they are completed
+        Index("ix_tasks_user_window", "user_id", "assigned_window_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
-    effort_level = Column(String(10), nullable=False)  # high, medium, low
+    effort_level = Column(Level, nullable=False)  # high, medium, low, stored as 0-2
     estimated_duration = Column(Integer, nullable=True)  # Duration in minutes
     deadline = Column(Date, nullable=True)
     is_completed = Column(Boolean, default=False, nullable=False)
@@ -85,3 +164,13 @@ class Task(Base):
     def __repr__(self):
         return f"<Task(id={self.id}, title='{self.title}', effort={self.effort_level})>"
 
+
+# Matches the task listing sort order, so pages are read in index order
+Index(
+    "ix_tasks_user_sort",
+    Task.user_id,
+    Task.is_completed,
+    Task.deadline,
+    Task.created_at.desc(),
+    Task.id.desc()
+)
@@ -5,14 +5,14 @@ Handles user authentication using session-based cookies.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..auth import create_user, authenticate_user, get_current_user
+from ..auth import create_user, authenticate_user, get_current_user, invalidate_cached_user
 from ..schemas import UserCreate, UserLogin, UserResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.post("/register")
@@ -38,7 +38,7 @@ async def register(
         
         # Create user
         user_data = UserCreate(username=username, email=email, password=password)
-        user = create_user(db, user_data)
+        user = await create_user(db, user_data)
         
         # Automatically log in the new user
         request.session["user_id"] = user.id
@@ -73,7 +73,7 @@ async def login(
     Authenticates credentials and creates a session.
     """
     # Authenticate user
-    user = authenticate_user(db, username, password)
+    user = await authenticate_user(db, username, password)
     
     if not user:
         # Return to login page with error
@@ -98,7 +98,10 @@ async def logout(request: Request):
     
     Clears the session and redirects to home page.
     """
-    # Clear session
+    # Forget the cached user and clear session
+    user_id = request.session.get("user_id")
+    if user_id:
+        invalidate_cached_user(user_id)
     request.session.clear()
     
     # Redirect to home page
@@ -5,21 +5,17 @@ Handles creation, reading, updating, and deletion of energy windows.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
-from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import RedirectResponse, HTMLResponse, ORJSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import time
-from pathlib import Path
 
 from ..database import get_db
-from ..models import EnergyWindow
+from ..templates import templates
+from ..models import DAYS, LEVELS, EnergyWindow
 from ..schemas import EnergyWindowCreate, EnergyWindowUpdate, EnergyWindowResponse
 
-router = APIRouter()
-
-# Setup templates
-BASE_DIR = Path(__file__).parent.parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 def require_auth(request: Request) -> int:
@@ -52,12 +48,20 @@ async def energy_windows_page(
     if not user_id:
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     
-    # Get user's energy windows
-    windows = db.query(EnergyWindow).filter(
-        EnergyWindow.user_id == user_id
-    ).order_by(
-        EnergyWindow.day_of_week,
-        EnergyWindow.time_start
+    # Get user's energy windows as plain rows - the template only reads them
+    windows = db.execute(
+        select(
+            EnergyWindow.id,
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start,
+            EnergyWindow.time_end,
+            EnergyWindow.energy_level
+        ).where(
+            EnergyWindow.user_id == user_id
+        ).order_by(
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start
+        )
     ).all()
     
     return templates.TemplateResponse(
@@ -65,8 +69,8 @@ async def energy_windows_page(
         {
             "request": request,
             "windows": windows,
-            "days": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
-            "levels": ["high", "medium", "low"]
+            "days": DAYS,
+            "levels": LEVELS
         }
     )
 
@@ -81,11 +85,22 @@ async def list_energy_windows(
     """
     user_id = require_auth(request)
     
-    windows = db.query(EnergyWindow).filter(
-        EnergyWindow.user_id == user_id
-    ).order_by(
-        EnergyWindow.day_of_week,
-        EnergyWindow.time_start
+    # Plain rows skip ORM hydration; the response model reads them by attribute
+    windows = db.execute(
+        select(
+            EnergyWindow.id,
+            EnergyWindow.user_id,
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start,
+            EnergyWindow.time_end,
+            EnergyWindow.energy_level,
+            EnergyWindow.created_at
+        ).where(
+            EnergyWindow.user_id == user_id
+        ).order_by(
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start
+        )
     ).all()
     
     return windows
@@ -105,6 +120,18 @@ async def create_energy_window(
     """
     user_id = require_auth(request)
     
+    if day_of_week not in DAYS:
+        return RedirectResponse(
+            url="/energy?error=Invalid day of week",
+            status_code=status.HTTP_303_SEE_OTHER
+        )
+    
+    if energy_level not in LEVELS:
+        return RedirectResponse(
+            url="/energy?error=Invalid energy level",
+            status_code=status.HTTP_303_SEE_OTHER
+        )
+    
     try:
         # Parse time strings (format: "HH:MM")
         start_time = time.fromisoformat(time_start)
@@ -156,13 +183,10 @@ async def delete_energy_window(
     """
     user_id = require_auth(request)
     
-    # Get window and verify ownership
-    window = db.query(EnergyWindow).filter(
-        EnergyWindow.id == window_id,
-        EnergyWindow.user_id == user_id
-    ).first()
+    # Get window by primary key and verify ownership
+    window = db.get(EnergyWindow, window_id)
     
-    if not window:
+    if window is None or window.user_id != user_id:
         return RedirectResponse(
             url="/energy?error=Energy window not found",
             status_code=status.HTTP_303_SEE_OTHER
@@ -189,13 +213,10 @@ async def update_energy_window(
     """
     user_id = require_auth(request)
     
-    # Get window and verify ownership
-    window = db.query(EnergyWindow).filter(
-        EnergyWindow.id == window_id,
-        EnergyWindow.user_id == user_id
-    ).first()
+    # Get window by primary key and verify ownership
+    window = db.get(EnergyWindow, window_id)
     
-    if not window:
+    if window is None or window.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Energy window not found"
@@ -5,21 +5,27 @@ Handles schedule generation and display.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from pathlib import Path
-from collections import defaultdict
+from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse, ORJSONResponse
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, load_only
 
 from ..database import get_db
+from ..templates import stream_template
 from ..models import Task, EnergyWindow
 from ..scheduler import schedule_tasks, clear_schedule
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Setup templates
-BASE_DIR = Path(__file__).parent.parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+# Task columns shown on the schedule page
+SCHEDULE_TASK_COLUMNS = load_only(
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.effort_level,
+    Task.estimated_duration,
+    Task.deadline,
+    Task.assigned_window_id
+)
 
 
 def require_auth(request: Request) -> int:
@@ -47,38 +53,60 @@ async def schedule_view(
     Schedule view page.
     
     Shows tasks organized by energy windows with compassionate messaging.
+    The page is streamed to the client in chunks while the template
+    renders. Since the 200 status is sent with the first chunk, a rendering
+    error part-way through ends in a truncated page rather than a 500.
     """
     user_id = request.session.get("user_id")
     
     if not user_id:
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     
-    # Get all energy windows
-    windows = db.query(EnergyWindow).filter(
-        EnergyWindow.user_id == user_id
-    ).order_by(
-        EnergyWindow.day_of_week,
-        EnergyWindow.time_start
+    # Get energy windows with their incomplete assigned tasks in one query.
+    # Windows without tasks come back once with task = None.
+    window_rows = db.execute(
+        select(
+            EnergyWindow.id,
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start,
+            EnergyWindow.time_end,
+            EnergyWindow.energy_level,
+            Task
+        ).outerjoin(
+            Task,
+            and_(
+                Task.assigned_window_id == EnergyWindow.id,
+                Task.is_completed == False
+            )
+        ).where(
+            EnergyWindow.user_id == user_id
+        ).order_by(
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start,
+            EnergyWindow.id
+        ).options(SCHEDULE_TASK_COLUMNS)
     ).all()
     
-    # Get assigned tasks
-    assigned_tasks = db.query(Task).filter(
-        Task.user_id == user_id,
-        Task.is_completed == False,
-        Task.assigned_window_id != None
-    ).all()
+    # Collapse the joined rows into windows and their tasks in one pass
+    windows = []
+    assigned_tasks = []
+    tasks_by_window = {}
+    for row in window_rows:
+        if not windows or windows[-1].id != row.id:
+            windows.append(row)
+            tasks_by_window[row.id] = []
+        if row.Task is not None:
+            assigned_tasks.append(row.Task)
+            tasks_by_window[row.id].append(row.Task)
     
     # Get unassigned tasks
-    unassigned_tasks = db.query(Task).filter(
-        Task.user_id == user_id,
-        Task.is_completed == False,
-        Task.assigned_window_id == None
-    ).all()
-    
-    # Organize tasks by window
-    tasks_by_window = defaultdict(list)
-    for task in assigned_tasks:
-        tasks_by_window[task.assigned_window_id].append(task)
+    unassigned_tasks = db.execute(
+        select(Task).where(
+            Task.user_id == user_id,
+            Task.is_completed == False,
+            Task.assigned_window_id == None
+        ).options(SCHEDULE_TASK_COLUMNS)
+    ).scalars().all()
     
     # Generate compassionate message
     if not windows:
@@ -97,16 +125,17 @@ async def schedule_view(
         message = f"{len(assigned_tasks)} task(s) scheduled. {len(unassigned_tasks)} task(s) still need a window."
         message_type = "warning"
     
-    return templates.TemplateResponse(
-        "schedule.html",
-        {
+    # Stream the page as it renders instead of building the whole HTML first
+    return StreamingResponse(
+        stream_template("schedule.html", {
             "request": request,
             "windows": windows,
-            "tasks_by_window": dict(tasks_by_window),
+            "tasks_by_window": tasks_by_window,
             "unassigned_tasks": unassigned_tasks,
             "message": message,
             "message_type": message_type
-        }
+        }),
+        media_type="text/html"
     )
 
 
@@ -4,23 +4,33 @@ Tasks CRUD routes.
 Handles creation, reading, updating, and deletion of academic tasks.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
-from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Form, Query
+from fastapi.responses import RedirectResponse, HTMLResponse, Response, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import and_, delete, false, or_, select, update
 from sqlalchemy.orm import Session
 from datetime import date
-from pathlib import Path
 from typing import Optional
 
 from ..database import get_db
-from ..models import Task
+from ..templates import templates
+from ..models import LEVELS, Task
 from ..schemas import TaskCreate, TaskUpdate, TaskResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Setup templates
-BASE_DIR = Path(__file__).parent.parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+# Maximum number of tasks shown on one tasks page
+TASKS_PAGE_SIZE = 200
+
+# Sort order for task listings; id breaks ties so pages are stable.
+# SQLite sorts NULL deadlines first.
+TASK_ORDER = (Task.is_completed, Task.deadline, Task.created_at.desc(), Task.id.desc())
+
+# Task columns returned by the JSON listing, in TaskResponse field order
+TASK_RESPONSE_COLUMNS = tuple(getattr(Task, name) for name in TaskResponse.model_fields)
+
+# Serializes task lists straight to JSON bytes without re-validating them
+TASK_LIST_ADAPTER = TypeAdapter(list[TaskResponse])
 
 
 def require_auth(request: Request) -> int:
@@ -38,36 +48,97 @@ def require_auth(request: Request) -> int:
     return user_id
 
 
+def tasks_after(cursor: Task):
+    """
+    Build a filter matching tasks that sort after the given task.
+    
+    Mirrors TASK_ORDER so task listings can be paginated by keyset
+    (WHERE on the sort columns) instead of OFFSET.
+    
+    Args:
+        cursor: Last task of the previous page
+        
+    Returns:
+        SQLAlchemy filter expression
+    """
+    if cursor.deadline is None:
+        deadline_after = Task.deadline != None
+        same_deadline = Task.deadline == None
+    else:
+        deadline_after = Task.deadline > cursor.deadline
+        same_deadline = Task.deadline == cursor.deadline
+    
+    # Incomplete tasks sort before completed ones
+    completion_after = false() if cursor.is_completed else Task.is_completed == True
+    same_completion = Task.is_completed == cursor.is_completed
+    return or_(
+        completion_after,
+        and_(same_completion, deadline_after),
+        and_(same_completion, same_deadline, Task.created_at < cursor.created_at),
+        and_(
+            same_completion,
+            same_deadline,
+            Task.created_at == cursor.created_at,
+            Task.id < cursor.id
+        )
+    )
+
+
+def get_task_cursor(db: Session, user_id: int, after_id: int) -> Task | None:
+    """
+    Get the task a listing page continues after.
+    
+    Returns None if the task doesn't exist or belongs to another user.
+    """
+    cursor = db.get(Task, after_id)
+    if cursor is None or cursor.user_id != user_id:
+        return None
+    return cursor
+
+
 @router.get("/", response_class=HTMLResponse)
 async def tasks_page(
     request: Request,
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
     Task management page.
     
-    Shows form to add new tasks and list of existing tasks.
+    Shows form to add new tasks and a page of existing tasks, with a link
+    to the next page when there are more.
     """
     user_id = request.session.get("user_id")
     
     if not user_id:
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     
-    # Get user's tasks
-    tasks = db.query(Task).filter(
-        Task.user_id == user_id
-    ).order_by(
-        Task.is_completed,
-        Task.deadline,
-        Task.created_at.desc()
-    ).all()
+    # Get a page of user's tasks
+    query = db.query(Task).filter(Task.user_id == user_id)
+    
+    if after_id is not None:
+        cursor = get_task_cursor(db, user_id, after_id)
+        if cursor is None:
+            return RedirectResponse(
+                url="/tasks?error=Task not found",
+                status_code=status.HTTP_303_SEE_OTHER
+            )
+        query = query.filter(tasks_after(cursor))
+    
+    # Fetch one extra row to know whether there is a next page
+    tasks = query.order_by(*TASK_ORDER).limit(TASKS_PAGE_SIZE + 1).all()
+    next_after_id = None
+    if len(tasks) > TASKS_PAGE_SIZE:
+        tasks = tasks[:TASKS_PAGE_SIZE]
+        next_after_id = tasks[-1].id
     
     return templates.TemplateResponse(
         "tasks.html",
         {
             "request": request,
             "tasks": tasks,
-            "levels": ["high", "medium", "low"]
+            "next_after_id": next_after_id,
+            "levels": LEVELS
         }
     )
 
@@ -76,27 +147,39 @@ async def tasks_page(
 async def list_tasks(
     request: Request,
     include_completed: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get all tasks for the authenticated user.
+    Get a page of tasks for the authenticated user.
     
-    By default, excludes completed tasks.
+    By default, excludes completed tasks. Pass the id of the last task
+    received as after_id to get the next page.
     """
     user_id = require_auth(request)
     
-    query = db.query(Task).filter(Task.user_id == user_id)
+    # Select plain columns - no ORM objects are needed to build the response
+    query = select(*TASK_RESPONSE_COLUMNS).where(Task.user_id == user_id)
     
     if not include_completed:
-        query = query.filter(Task.is_completed == False)
+        query = query.where(Task.is_completed == False)
+    
+    if after_id is not None:
+        cursor = get_task_cursor(db, user_id, after_id)
+        if cursor is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+        query = query.where(tasks_after(cursor))
     
-    tasks = query.order_by(
-        Task.is_completed,
-        Task.deadline,
-        Task.created_at.desc()
-    ).all()
+    rows = db.execute(query.order_by(*TASK_ORDER).limit(limit)).all()
     
-    return tasks
+    # Rows come straight from the database, so skip validation and return
+    # the serialized JSON directly (FastAPI would otherwise validate again)
+    tasks = [TaskResponse.model_construct(**row._mapping) for row in rows]
+    return Response(content=TASK_LIST_ADAPTER.dump_json(tasks), media_type="application/json")
 
 
 @router.post("/create")
@@ -114,6 +197,12 @@ async def create_task(
     """
     user_id = require_auth(request)
     
+    if effort_level not in LEVELS:
+        return RedirectResponse(
+            url="/tasks?error=Invalid effort level",
+            status_code=status.HTTP_303_SEE_OTHER
+        )
+    
     try:
         # Parse deadline if provided
         deadline_date = None
@@ -160,20 +249,21 @@ async def toggle_task_completion(
     """
     user_id = require_auth(request)
     
-    # Get task and verify ownership
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == user_id
-    ).first()
+    # Toggle completion status; the ownership check is part of the WHERE
+    result = db.execute(
+        update(Task).where(
+            Task.id == task_id,
+            Task.user_id == user_id
+        ).values(is_completed=~Task.is_completed),
+        execution_options={"synchronize_session": False}
+    )
     
-    if not task:
+    if result.rowcount == 0:
         return RedirectResponse(
             url="/tasks?error=Task not found",
             status_code=status.HTTP_303_SEE_OTHER
         )
     
-    # Toggle completion status
-    task.is_completed = not task.is_completed
     db.commit()
     
     return RedirectResponse(url="/tasks", status_code=status.HTTP_303_SEE_OTHER)
@@ -192,20 +282,21 @@ async def delete_task(
     """
     user_id = require_auth(request)
     
-    # Get task and verify ownership
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == user_id
-    ).first()
+    # Delete task; the ownership check is part of the WHERE
+    result = db.execute(
+        delete(Task).where(
+            Task.id == task_id,
+            Task.user_id == user_id
+        ),
+        execution_options={"synchronize_session": False}
+    )
     
-    if not task:
+    if result.rowcount == 0:
         return RedirectResponse(
             url="/tasks?error=Task not found",
             status_code=status.HTTP_303_SEE_OTHER
         )
     
-    # Delete task
-    db.delete(task)
     db.commit()
     
     return RedirectResponse(url="/tasks", status_code=status.HTTP_303_SEE_OTHER)
@@ -225,25 +316,30 @@ async def update_task(
     """
     user_id = require_auth(request)
     
-    # Get task and verify ownership
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == user_id
-    ).first()
+    owned_task = and_(Task.id == task_id, Task.user_id == user_id)
+    
+    # Update fields if provided and get the updated row back in the same
+    # statement; the ownership check is part of the WHERE
+    update_data = task_data.model_dump(exclude_unset=True)
+    if update_data:
+        statement = update(Task).where(owned_task).values(**update_data).returning(
+            *TASK_RESPONSE_COLUMNS
+        )
+    else:
+        statement = select(*TASK_RESPONSE_COLUMNS).where(owned_task)
+    
+    task = db.execute(
+        statement,
+        execution_options={"synchronize_session": False}
+    ).one_or_none()
     
-    if not task:
+    if task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    # Update fields if provided
-    update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
-    
     db.commit()
-    db.refresh(task)
     
     return task
 
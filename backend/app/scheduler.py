@@ -5,11 +5,41 @@ Deterministic task scheduling based on effort-energy mapping.
 Uses compassionate, non-judgmental logic to assign tasks.
 """
 
-from datetime import datetime, date, time, timedelta
-from typing import List, Dict, Optional
+import math
+from datetime import date
+from functools import lru_cache
+from typing import List, Dict, Optional, Sequence, Tuple, TypedDict
+from sqlalchemy import Row, func, select, update
 from sqlalchemy.orm import Session
 
-from .models import Task, EnergyWindow
+from .models import DAYS, LEVELS, Task, EnergyWindow
+
+# Acceptable energy levels for each task effort level, most preferred first.
+# High-effort tasks need good energy, medium is flexible, and low effort can
+# fit anywhere (preferring low to save high energy).
+_PRIORITY = {
+    "high": ("high", "medium"),
+    "medium": ("medium", "high", "low"),
+    "low": ("low", "medium", "high")
+}
+_DEFAULT_PRIORITY = ("medium", "high", "low")
+
+# Sort rank of each effort level, highest effort first
+_EFFORT_RANK = {level: rank for rank, level in enumerate(LEVELS)}
+
+# Minutes a task is assumed to need when it has no estimated duration
+DEFAULT_TASK_DURATION = 60
+
+
+class ScheduleResult(TypedDict):
+    """Outcome of a schedule_tasks run."""
+    success: bool
+    assigned_count: int
+    unassigned_count: int
+    message: str
+    # Plain rows with the task's id, effort_level, estimated_duration,
+    # deadline and created_at
+    unassigned_tasks: List[Row]
 
 
 def calculate_window_duration(window: EnergyWindow) -> int:
@@ -17,55 +47,28 @@ def calculate_window_duration(window: EnergyWindow) -> int:
     Calculate duration of an energy window in minutes.
     
     Args:
-        window: EnergyWindow object
+        window: EnergyWindow object or row with time_start and time_end
         
     Returns:
         Duration in minutes
     """
-    # Convert time objects to datetime for calculation
-    start = datetime.combine(date.today(), window.time_start)
-    end = datetime.combine(date.today(), window.time_end)
+    # Work in plain integer seconds rather than building datetime objects
+    start, end = window.time_start, window.time_end
+    duration = (
+        (end.hour - start.hour) * 3600
+        + (end.minute - start.minute) * 60
+        + (end.second - start.second)
+    )
     
     # Handle windows that cross midnight
-    if end <= start:
-        end += timedelta(days=1)
+    if duration <= 0:
+        duration += 24 * 3600
     
-    duration = (end - start).total_seconds() / 60
-    return int(duration)
+    return duration // 60
 
 
-def get_available_window_capacity(window: EnergyWindow, db: Session) -> int:
-    """
-    Get remaining capacity (in minutes) for an energy window.
-    
-    Calculates how much time is still available after accounting
-    for already assigned tasks.
-    
-    Args:
-        window: EnergyWindow object
-        db: Database session
-        
-    Returns:
-        Remaining capacity in minutes
-    """
-    total_duration = calculate_window_duration(window)
-    
-    # Get all tasks assigned to this window
-    assigned_tasks = db.query(Task).filter(
-        Task.assigned_window_id == window.id,
-        Task.is_completed == False
-    ).all()
-    
-    # Sum up duration of assigned tasks
-    used_duration = sum(
-        task.estimated_duration for task in assigned_tasks 
-        if task.estimated_duration
-    )
-    
-    return max(0, total_duration - used_duration)
-
-
-def get_effort_priority_order(effort_level: str) -> List[str]:
+@lru_cache(maxsize=8)
+def get_effort_priority_order(effort_level: str) -> Tuple[str, ...]:
     """
     Get priority order for energy levels based on task effort.
     
@@ -77,14 +80,9 @@ def get_effort_priority_order(effort_level: str) -> List[str]:
         effort_level: Task effort level (high, medium, low)
         
     Returns:
-        Ordered list of acceptable energy levels
+        Ordered tuple of acceptable energy levels (shared, don't mutate)
     """
-    priority_map = {
-        "high": ["high", "medium"],  # High effort needs good energy
-        "medium": ["medium", "high", "low"],  # Medium is flexible
-        "low": ["low", "medium", "high"]  # Low effort can fit anywhere
-    }
-    return priority_map.get(effort_level, ["medium", "high", "low"])
+    return _PRIORITY.get(effort_level, _DEFAULT_PRIORITY)
 
 
 def get_day_name(target_date: date) -> str:
@@ -97,14 +95,41 @@ def get_day_name(target_date: date) -> str:
     Returns:
         Day name (e.g., "Monday")
     """
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    return days[target_date.weekday()]
+    return DAYS[target_date.weekday()]
+
+
+def first_fit(
+    energy_priorities: Sequence[str],
+    task_duration: int,
+    windows_by_energy: Dict[str, List[EnergyWindow]],
+    remaining_by_window: Dict[int, int]
+) -> Optional[EnergyWindow]:
+    """
+    First-fit search for a window with enough remaining capacity.
+    
+    Windows are tried level by level in priority order, and in their
+    original order within a level.
+    
+    Args:
+        energy_priorities: Acceptable energy levels, most preferred first
+        task_duration: Minutes the task needs
+        windows_by_energy: Energy windows grouped by energy level
+        remaining_by_window: Minutes still free, by window ID
+        
+    Returns:
+        First window that fits or None
+    """
+    for energy_level in energy_priorities:
+        for window in windows_by_energy.get(energy_level, ()):
+            if remaining_by_window[window.id] >= task_duration:
+                return window
+    return None
 
 
 def find_best_window(
     task: Task,
-    windows: List[EnergyWindow],
-    db: Session,
+    windows_by_energy: Dict[str, List[EnergyWindow]],
+    remaining_by_window: Dict[int, int],
     current_date: date = None
 ) -> Optional[EnergyWindow]:
     """
@@ -112,11 +137,14 @@ def find_best_window(
     
     Considers effort-energy mapping, deadline constraints, and capacity.
     Uses graceful degradation if perfect match isn't available.
+    Capacity is read from a precomputed lookup, so no queries are run.
     
     Args:
-        task: Task to schedule
-        windows: Available energy windows
-        db: Database session
+        task: Task (or row with effort_level, estimated_duration and
+            deadline) to schedule
+        windows_by_energy: Available energy windows (objects or rows with
+            id) grouped by energy level
+        remaining_by_window: Minutes still free, by window ID
         current_date: Reference date (defaults to today)
         
     Returns:
@@ -125,46 +153,21 @@ def find_best_window(
     if current_date is None:
         current_date = date.today()
     
+    # A task whose deadline has passed can't be scheduled. Otherwise all
+    # windows are candidates: for MVP, windows are in the current week.
+    if task.deadline and task.deadline < current_date:
+        return None
+    
     # Get effort priority order
     energy_priorities = get_effort_priority_order(task.effort_level)
     
-    # If task has deadline, filter windows before deadline
-    candidate_windows = []
-    
-    if task.deadline:
-        # Calculate days until deadline
-        days_until_deadline = (task.deadline - current_date).days
-        
-        # Only consider windows in the next week (or until deadline)
-        for window in windows:
-            # For MVP, we'll consider windows in the current week
-            # In production, we'd want more sophisticated date handling
-            if days_until_deadline >= 0:
-                candidate_windows.append(window)
-    else:
-        # No deadline constraint, consider all windows
-        candidate_windows = windows
+    task_duration = task.estimated_duration or DEFAULT_TASK_DURATION
     
     # Try to find window matching energy priorities
-    for energy_level in energy_priorities:
-        matching_windows = [
-            w for w in candidate_windows 
-            if w.energy_level == energy_level
-        ]
-        
-        for window in matching_windows:
-            # Check if window has enough capacity
-            capacity = get_available_window_capacity(window, db)
-            task_duration = task.estimated_duration or 60  # Default 60 min if not specified
-            
-            if capacity >= task_duration:
-                return window
-    
-    # No perfect match found - return None for graceful handling
-    return None
+    return first_fit(energy_priorities, task_duration, windows_by_energy, remaining_by_window)
 
 
-def schedule_tasks(user_id: int, db: Session) -> Dict[str, any]:
+def schedule_tasks(user_id: int, db: Session) -> ScheduleResult:
     """
     Main scheduling algorithm.
     
@@ -176,26 +179,54 @@ def schedule_tasks(user_id: int, db: Session) -> Dict[str, any]:
         db: Database session
         
     Returns:
-        Dictionary with scheduling results and human-centered message
+        Scheduling results with a human-centered message. Unassigned tasks
+        are returned as plain rows, not ORM objects.
     """
-    # Get all unscheduled, incomplete tasks
-    unscheduled_tasks = db.query(Task).filter(
-        Task.user_id == user_id,
-        Task.is_completed == False,
-        Task.assigned_window_id == None
-    ).order_by(
-        Task.deadline.asc().nullslast(),  # Deadline tasks first
-        Task.effort_level.desc(),  # High effort next
-        Task.created_at.asc()  # Oldest first
+    # Get all unscheduled, incomplete tasks as plain rows holding only the
+    # columns scheduling reads - no ORM objects are needed
+    unscheduled_tasks = db.execute(
+        select(
+            Task.id,
+            Task.effort_level,
+            Task.estimated_duration,
+            Task.deadline,
+            Task.created_at
+        ).where(
+            Task.user_id == user_id,
+            Task.is_completed == False,
+            Task.assigned_window_id == None
+        )
     ).all()
     
-    # Get all energy windows for user
-    windows = db.query(EnergyWindow).filter(
-        EnergyWindow.user_id == user_id
+    # Scheduling order: earliest deadline first (tasks without one last),
+    # then high, medium, low effort, then oldest first. Sorted here rather
+    # than in SQL, so the order doesn't depend on how levels are stored.
+    unscheduled_tasks.sort(key=lambda task: (
+        task.deadline or date.max,
+        _EFFORT_RANK.get(task.effort_level, len(LEVELS)),
+        task.created_at,
+        task.id
+    ))
+    
+    # Get all energy windows for user, also as plain rows. First fit takes
+    # windows in this order, so it is fixed here rather than left to
+    # whichever index the query planner picks.
+    windows = db.execute(
+        select(
+            EnergyWindow.id,
+            EnergyWindow.energy_level,
+            EnergyWindow.time_start,
+            EnergyWindow.time_end
+        ).where(
+            EnergyWindow.user_id == user_id
+        ).order_by(
+            EnergyWindow.day_of_week,
+            EnergyWindow.time_start,
+            EnergyWindow.id
+        )
     ).all()
     
     # Track results
-    assigned_count = 0
     unassigned_tasks = []
     
     # If no windows defined, provide helpful message
@@ -218,19 +249,69 @@ def schedule_tasks(user_id: int, db: Session) -> Dict[str, any]:
             "unassigned_tasks": []
         }
     
+    # Minutes already used per window, in one grouped query. Tasks without
+    # an estimate count as DEFAULT_TASK_DURATION, as in find_best_window.
+    used_by_window = dict(
+        db.query(
+            Task.assigned_window_id,
+            func.sum(func.coalesce(Task.estimated_duration, DEFAULT_TASK_DURATION))
+        ).filter(
+            Task.user_id == user_id,
+            Task.is_completed == False,
+            Task.assigned_window_id != None
+        ).group_by(Task.assigned_window_id).all()
+    )
+    
+    # Free minutes per window, kept up to date as tasks are assigned
+    remaining_by_window = {
+        w.id: calculate_window_duration(w) - used_by_window.get(w.id, 0)
+        for w in windows
+    }
+    
+    # Shortest duration needed by any task after each position, so windows
+    # that can no longer fit anything can be dropped from the search
+    min_needed_after = [0] * len(unscheduled_tasks)
+    min_needed = math.inf
+    for i in range(len(unscheduled_tasks) - 1, -1, -1):
+        min_needed_after[i] = min_needed
+        min_needed = min(
+            min_needed,
+            unscheduled_tasks[i].estimated_duration or DEFAULT_TASK_DURATION
+        )
+    
+    # Group windows that can fit at least one task by energy level. Windows
+    # with an unknown energy level can never be picked, so they are left out.
+    windows_by_energy = {level: [] for level in LEVELS}
+    for window in windows:
+        if (window.energy_level in windows_by_energy
+                and remaining_by_window[window.id] >= min_needed):
+            windows_by_energy[window.energy_level].append(window)
+    
     # Attempt to schedule each task
-    for task in unscheduled_tasks:
-        best_window = find_best_window(task, windows, db)
+    assignments = []
+    for i, task in enumerate(unscheduled_tasks):
+        best_window = find_best_window(task, windows_by_energy, remaining_by_window)
         
         if best_window:
-            # Assign task to window
-            task.assigned_window_id = best_window.id
-            assigned_count += 1
+            # Assign task to window and account for the time it uses
+            assignments.append({"id": task.id, "assigned_window_id": best_window.id})
+            remaining_by_window[best_window.id] -= (
+                task.estimated_duration or DEFAULT_TASK_DURATION
+            )
+            
+            # Capacity only shrinks, so a window too small for every task
+            # still to come stays dead for the rest of the run
+            if remaining_by_window[best_window.id] < min_needed_after[i]:
+                windows_by_energy[best_window.energy_level].remove(best_window)
         else:
             # Could not find suitable window
             unassigned_tasks.append(task)
     
-    # Commit all assignments
+    assigned_count = len(assignments)
+    
+    # Write all assignments in one bulk UPDATE by primary key and commit
+    if assignments:
+        db.execute(update(Task), assignments)
     db.commit()
     
     # Generate compassionate message
@@ -263,9 +344,19 @@ def clear_schedule(user_id: int, db: Session) -> None:
         user_id: User ID to clear schedule for
         db: Database session
     """
-    db.query(Task).filter(
-        Task.user_id == user_id
-    ).update({"assigned_window_id": None})
+    # The session doesn't autoflush, so write pending changes before the
+    # bulk UPDATE can run past them
+    db.flush()
+    
+    # Only rows that are actually assigned need writing. Skip matching the
+    # rows against the session; commit() expires loaded objects anyway.
+    db.execute(
+        update(Task).where(
+            Task.user_id == user_id,
+            Task.assigned_window_id != None
+        ).values(assigned_window_id=None),
+        execution_options={"synchronize_session": False}
+    )
     
     db.commit()
 
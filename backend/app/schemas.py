@@ -5,8 +5,13 @@ These schemas ensure data validation and provide clear API contracts.
 """
 
 from datetime import datetime, date, time
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, validator
+from typing import Literal, Optional
+from pydantic import BaseModel, EmailStr, Field, ValidationInfo, field_validator
+
+
+# Closed sets of values, checked by membership instead of regex
+EnergyLevel = Literal["high", "medium", "low"]
+DayName = Literal["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
 
 # ============= User Schemas =============
@@ -17,7 +22,8 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str = Field(..., min_length=8, max_length=100)
 
-    @validator('username')
+    @field_validator('username')
+    @classmethod
     def username_alphanumeric(cls, v):
         """Ensure username contains only alphanumeric characters and underscores."""
         if not v.replace('_', '').isalnum():
@@ -46,25 +52,26 @@ class UserResponse(BaseModel):
 
 class EnergyWindowCreate(BaseModel):
     """Schema for creating an energy window."""
-    day_of_week: str = Field(..., pattern="^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)$")
+    day_of_week: DayName
     time_start: time
     time_end: time
-    energy_level: str = Field(..., pattern="^(high|medium|low)$")
+    energy_level: EnergyLevel
 
-    @validator('time_end')
-    def end_after_start(cls, v, values):
+    @field_validator('time_end')
+    @classmethod
+    def end_after_start(cls, v, info: ValidationInfo):
         """Ensure end time is after start time."""
-        if 'time_start' in values and v <= values['time_start']:
+        if 'time_start' in info.data and v <= info.data['time_start']:
             raise ValueError('End time must be after start time')
         return v
 
 
 class EnergyWindowUpdate(BaseModel):
     """Schema for updating an energy window."""
-    day_of_week: Optional[str] = Field(None, pattern="^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)$")
+    day_of_week: Optional[DayName] = None
     time_start: Optional[time] = None
     time_end: Optional[time] = None
-    energy_level: Optional[str] = Field(None, pattern="^(high|medium|low)$")
+    energy_level: Optional[EnergyLevel] = None
 
 
 class EnergyWindowResponse(BaseModel):
@@ -87,7 +94,7 @@ class TaskCreate(BaseModel):
     """Schema for creating a task."""
     title: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = None
-    effort_level: str = Field(..., pattern="^(high|medium|low)$")
+    effort_level: EnergyLevel
     estimated_duration: Optional[int] = Field(None, gt=0, description="Duration in minutes")
     deadline: Optional[date] = None
 
@@ -96,7 +103,7 @@ class TaskUpdate(BaseModel):
     """Schema for updating a task."""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = None
-    effort_level: Optional[str] = Field(None, pattern="^(high|medium|low)$")
+    effort_level: Optional[EnergyLevel] = None
     estimated_duration: Optional[int] = Field(None, gt=0, description="Duration in minutes")
     deadline: Optional[date] = None
     is_completed: Optional[bool] = None
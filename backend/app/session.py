@@ -0,0 +1,129 @@
+"""
+Cookie-based session middleware for TaskRhythm.
+
+A drop-in replacement for Starlette's SessionMiddleware that only re-signs
+and sets the session cookie when the session was actually modified during
+the request, instead of on every response.
+"""
+
+import json
+from base64 import b64decode, b64encode
+
+import itsdangerous
+from itsdangerous.exc import BadSignature
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class Session(dict):
+    """
+    Session data dictionary that tracks whether it has been modified.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modified = False
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        self.modified = True
+        super().clear()
+
+    def pop(self, *args):
+        self.modified = True
+        return super().pop(*args)
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.modified = True
+        super().update(*args, **kwargs)
+
+
+class SessionMiddleware:
+    """
+    Pure ASGI session middleware storing signed session data in a cookie.
+
+    The cookie format is compatible with Starlette's SessionMiddleware.
+    Since the cookie is only re-issued when the session changes, its
+    max_age counts from the last modification (e.g. login), not from the
+    last request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret_key: str,
+        session_cookie: str = "session",
+        max_age: int | None = 14 * 24 * 60 * 60,  # 14 days, in seconds
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False,
+    ) -> None:
+        self.app = app
+        self.signer = itsdangerous.TimestampSigner(str(secret_key))
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.path = path
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:  # Secure flag can be used with HTTPS only
+            self.security_flags += "; secure"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        initial_session_was_empty = True
+        session = Session()
+
+        # Only verify the signature when a cookie was actually sent
+        if self.session_cookie in connection.cookies:
+            data = connection.cookies[self.session_cookie].encode("utf-8")
+            try:
+                data = self.signer.unsign(data, max_age=self.max_age)
+                session = Session(json.loads(b64decode(data)))
+                initial_session_was_empty = False
+            except BadSignature:
+                pass
+
+        scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and session.modified:
+                headers = MutableHeaders(scope=message)
+                if session:
+                    # Session changed and has data to persist
+                    data = b64encode(json.dumps(session).encode("utf-8"))
+                    data = self.signer.sign(data)
+                    max_age = f"Max-Age={self.max_age}; " if self.max_age else ""
+                    headers.append(
+                        "Set-Cookie",
+                        f"{self.session_cookie}={data.decode('utf-8')}; "
+                        f"path={self.path}; {max_age}{self.security_flags}"
+                    )
+                elif not initial_session_was_empty:
+                    # Session has been cleared
+                    headers.append(
+                        "Set-Cookie",
+                        f"{self.session_cookie}=null; path={self.path}; "
+                        f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}"
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,58 @@
+"""
+Shared Jinja2 templates for TaskRhythm.
+
+A single Jinja2Templates instance is used by the app and every router so
+templates are loaded and compiled once per process.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+BASE_DIR = Path(__file__).parent.parent
+
+templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+# In production templates don't change while the server runs, so skip the
+# stat() check on every render (restart the server to pick up template
+# edits). Development keeps it, since uvicorn --reload only watches .py
+# files. Set TASKRHYTHM_ENV=production to turn it off.
+templates.env.auto_reload = os.getenv("TASKRHYTHM_ENV", "development") != "production"
+
+# Keep compiled bytecode on disk so restarts don't re-parse every template
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+
+# Characters of rendered output to collect before handing a chunk to the
+# response
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def stream_template(name: str, context: dict) -> Iterator[str]:
+    """
+    Render a template incrementally, in chunks of about STREAM_CHUNK_SIZE.
+    
+    Template.generate() yields every text and expression fragment on its
+    own; sending each as a separate response body message costs far more
+    than rendering the whole page, so fragments are joined first.
+    
+    Args:
+        name: Template file name
+        context: Template context
+        
+    Returns:
+        Iterator over chunks of rendered output
+    """
+    chunk = []
+    chunk_size = 0
+    for fragment in templates.get_template(name).generate(context):
+        chunk.append(fragment)
+        chunk_size += len(fragment)
+        if chunk_size >= STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        yield "".join(chunk)